@@ -1,11 +1,16 @@
 import os
 import re
+import sys
 import time
 import argparse
-from typing import Any, Dict, List, Optional, Tuple
+import functools
+from collections import deque
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable, Deque, Dict, FrozenSet, Hashable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
 import psutil
 
+@functools.cache
 def get_steam_path_windows() -> Optional[str]:
     try:
         import winreg
@@ -27,51 +32,148 @@ def get_steam_path_windows() -> Optional[str]:
             pass
     return None
 
-_token_re = re.compile(r'"([^"]*)"|(\{)|(\})', re.MULTILINE)
+INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+FILE_ATTRIBUTE_DIRECTORY = 0x10
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x1
+FILE_NOTIFY_CHANGE_DIR_NAME = 0x2
+FILE_NOTIFY_CHANGE_SIZE = 0x8
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+WAIT_OBJECT_0 = 0
+WAIT_TIMEOUT = 0x102
+MAXIMUM_WAIT_OBJECTS = 64
+WAIT_SLICE = 0.5
+
+try:
+    import ctypes
+    from ctypes import windll, wintypes
+    _kernel32 = windll.kernel32
+    _kernel32.GetFileAttributesW.argtypes = [wintypes.LPCWSTR]
+    _kernel32.GetFileAttributesW.restype = wintypes.DWORD
+    _kernel32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+    _kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+    _kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+    _kernel32.FindNextChangeNotification.restype = wintypes.BOOL
+    _kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+    _kernel32.FindCloseChangeNotification.restype = wintypes.BOOL
+    _kernel32.WaitForMultipleObjects.argtypes = [
+        wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD
+    ]
+    _kernel32.WaitForMultipleObjects.restype = wintypes.DWORD
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+except Exception:
+    _kernel32 = None
+
+def _isdir(path: str) -> bool:
+    if _kernel32 is None:
+        return os.path.isdir(path)
+    a = _kernel32.GetFileAttributesW(path)
+    return a != INVALID_FILE_ATTRIBUTES and bool(a & FILE_ATTRIBUTE_DIRECTORY)
+
+def _isfile(path: str) -> bool:
+    if _kernel32 is None:
+        return os.path.isfile(path)
+    a = _kernel32.GetFileAttributesW(path)
+    return a != INVALID_FILE_ATTRIBUTES and not (a & FILE_ATTRIBUTE_DIRECTORY)
+
+class ChangeWatcher:
+    def __init__(self, dirs: List[str]) -> None:
+        self.dirs = list(dirs)
+        self._handles: Dict[str, int] = {}
+        self._pending = set(self.dirs)
+        if _kernel32 is None:
+            return
+        flags = (
+            FILE_NOTIFY_CHANGE_FILE_NAME
+            | FILE_NOTIFY_CHANGE_DIR_NAME
+            | FILE_NOTIFY_CHANGE_SIZE
+            | FILE_NOTIFY_CHANGE_LAST_WRITE
+        )
+        for d in self.dirs[:MAXIMUM_WAIT_OBJECTS]:
+            h = _kernel32.FindFirstChangeNotificationW(d, True, flags)
+            if h and h != INVALID_HANDLE_VALUE:
+                self._handles[d] = h
+
+    def wait(self, timeout: float) -> Set[str]:
+        deadline = time.monotonic() + timeout
+        changed = self._pending | (set(self.dirs) - set(self._handles))
+        self._pending = set()
+        waiting = {d: h for d, h in self._handles.items() if d not in changed}
+        while waiting:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            dirs = list(waiting)
+            arr = (wintypes.HANDLE * len(dirs))(*(waiting[d] for d in dirs))
+            timeout_ms = int(min(remaining, WAIT_SLICE) * 1000)
+            r = _kernel32.WaitForMultipleObjects(len(dirs), arr, False, timeout_ms)
+            if r == WAIT_TIMEOUT:
+                continue
+            if not WAIT_OBJECT_0 <= r < WAIT_OBJECT_0 + len(dirs):
+                changed.update(dirs)
+                break
+            d = dirs[r - WAIT_OBJECT_0]
+            changed.add(d)
+            del waiting[d]
+            if not _kernel32.FindNextChangeNotification(self._handles[d]):
+                _kernel32.FindCloseChangeNotification(self._handles.pop(d))
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        return changed
+
+    def close(self) -> None:
+        for h in self._handles.values():
+            _kernel32.FindCloseChangeNotification(h)
+        self._handles = {}
+
+_token_re = re.compile(r'"([^"]*)"|(\{)|(\})')
 
 def parse_keyvalues(text: str) -> Dict[str, Any]:
-    tokens: List[str] = []
-    for m in _token_re.finditer(text):
-        if m.group(1) is not None:
-            tokens.append(m.group(1))
-        elif m.group(2) is not None:
-            tokens.append("{")
-        elif m.group(3) is not None:
-            tokens.append("}")
-
-    i = 0
+    it = _token_re.finditer(text)
+    intern = sys.intern
 
     def parse_object() -> Dict[str, Any]:
-        nonlocal i
         obj: Dict[str, Any] = {}
-        while i < len(tokens):
-            tok = tokens[i]
-            if tok == "}":
-                i += 1
-                return obj
-            key = tok
-            i += 1
-            if i >= len(tokens):
-                break
-            nxt = tokens[i]
-            if nxt == "{":
-                i += 1
-                obj[key] = parse_object()
+        key: Optional[str] = None
+        for m in it:
+            g1, g2, g3 = m.group(1), m.group(2), m.group(3)
+            if key is None:
+                if g3 is not None:
+                    return obj
+                key = g1 if g1 is not None else "{"
+            elif g2 is not None:
+                obj[intern(key)] = parse_object()
+                key = None
             else:
-                obj[key] = nxt
-                i += 1
+                obj[intern(key)] = g1 if g1 is not None else "}"
+                key = None
         return obj
 
     return parse_object()
 
-def load_kv_file(path: str) -> Dict[str, Any]:
+_file_cache: Dict[Hashable, Tuple[float, Mapping[str, Any]]] = {}
+
+def _load_cached(path: str, cache_key: Hashable, parse: Callable[[str], Dict[str, Any]]) -> Mapping[str, Any]:
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return {}
+    cached = _file_cache.get(cache_key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return parse_keyvalues(f.read())
+            value = MappingProxyType(parse(f.read()))
     except Exception:
         return {}
+    _file_cache[cache_key] = (mtime, value)
+    return value
 
-def get_library_paths(steam_path: str) -> List[str]:
+def load_kv_file(path: str) -> Mapping[str, Any]:
+    return _load_cached(path, ("kv", path), parse_keyvalues)
+
+@functools.lru_cache(maxsize=4)
+def _library_paths(steam_path: str, vdf_mtime: Optional[float]) -> Tuple[str, ...]:
     libs = {os.path.normpath(steam_path)}
     vdf_path = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
     kv = load_kv_file(vdf_path)
@@ -81,21 +183,25 @@ def get_library_paths(steam_path: str) -> List[str]:
         for _, v in lf.items():
             if isinstance(v, dict):
                 p = v.get("path")
-                if isinstance(p, str) and os.path.isdir(p):
+                if isinstance(p, str) and _isdir(p):
                     libs.add(os.path.normpath(p))
-    return sorted(libs)
+    return tuple(sorted(libs))
+
+def get_library_paths(steam_path: str) -> List[str]:
+    vdf_path = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
+    return list(_library_paths(steam_path, safe_mtime(vdf_path)))
 
 def find_active_downloads(libs: List[str]) -> List[Tuple[str, str]]:
     active: List[Tuple[str, str]] = []
     for lib in libs:
         downloading = os.path.join(lib, "steamapps", "downloading")
-        if not os.path.isdir(downloading):
+        if not _isdir(downloading):
             continue
         try:
-            for name in os.listdir(downloading):
-                p = os.path.join(downloading, name)
-                if name.isdigit() and os.path.isdir(p):
-                    active.append((name, lib))
+            with os.scandir(downloading) as it:
+                for entry in it:
+                    if entry.name.isdigit() and entry.is_dir(follow_symlinks=False):
+                        active.append((entry.name, lib))
         except OSError:
             pass
     return active
@@ -103,12 +209,55 @@ def find_active_downloads(libs: List[str]) -> List[Tuple[str, str]]:
 def get_app_manifest_path(appid: str, lib: str) -> str:
     return os.path.join(lib, "steamapps", f"appmanifest_{appid}.acf")
 
-def get_app_info(appid: str, lib: str) -> Tuple[str, int, int, str, int, int, int, int]:
+def _skip_object(it: Iterator["re.Match[str]"]) -> None:
+    depth = 1
+    for m in it:
+        if m.group(2) is not None:
+            depth += 1
+        elif m.group(3) is not None:
+            depth -= 1
+            if depth == 0:
+                return
+
+def parse_section_fields(text: str, section: str, keys: FrozenSet[str]) -> Dict[str, str]:
+    it = _token_re.finditer(text)
+    found: Dict[str, str] = {}
+    key: Optional[str] = None
+    in_section = False
+    for m in it:
+        g1, g2, g3 = m.group(1), m.group(2), m.group(3)
+        if key is None:
+            if g3 is not None:
+                if in_section:
+                    break
+                continue
+            key = g1 if g1 is not None else "{"
+        elif g2 is not None:
+            if not in_section and key == section:
+                in_section = True
+            else:
+                _skip_object(it)
+            key = None
+        else:
+            if in_section and key in keys:
+                found[key] = g1 if g1 is not None else "}"
+                if len(found) == len(keys):
+                    break
+            key = None
+    return found
+
+def get_appstate_fields(path: str, keys: FrozenSet[str]) -> Mapping[str, str]:
+    return _load_cached(
+        path,
+        ("appstate", path, keys),
+        lambda text: parse_section_fields(text, "AppState", keys),
+    )
+
+APP_INFO_KEYS = frozenset({"name", "BytesDownloaded", "BytesToDownload", "StateFlags"})
+
+def get_app_info(appid: str, lib: str) -> Tuple[str, int, int, str]:
     acf = get_app_manifest_path(appid, lib)
-    kv = load_kv_file(acf)
-    app = kv.get("AppState")
-    if not isinstance(app, dict):
-        return (f"AppID {appid}", 0, 0, "", 0, 0, 0, 0)
+    app = get_appstate_fields(acf, APP_INFO_KEYS)
 
     def to_int(x: Any) -> int:
         try:
@@ -116,106 +265,162 @@ def get_app_info(appid: str, lib: str) -> Tuple[str, int, int, str, int, int, in
         except Exception:
             return 0
 
-    name = app.get("name") if isinstance(app.get("name"), str) else f"AppID {appid}"
+    name = app.get("name", f"AppID {appid}")
     bd = to_int(app.get("BytesDownloaded"))
     btd = to_int(app.get("BytesToDownload"))
-    sf = str(app.get("StateFlags", ""))
-
-    bs = to_int(app.get("BytesStaged"))
-    bts = to_int(app.get("BytesToStage"))
-    bc = to_int(app.get("BytesCommitted"))
-    sod = to_int(app.get("SizeOnDisk"))
+    sf = app.get("StateFlags", "")
 
-    return (name, bd, btd, sf, bs, bts, bc, sod)
+    return (name, bd, btd, sf)
 
-APPID_RE = re.compile(r"\b(?:AppID|appid)\s*[:=]?\s*(\d{3,10})\b", re.IGNORECASE)
+_PAUSE_PAT = r"\b(?:paused|pause|pausing|suspend|suspended)\b|\bstop(?:ped|ping)?\b.*\bdownload\b"
+_RESUME_PAT = r"\b(?:resume|resuming|unpause|continuing|downloading)\b|\bstart(?:ed|ing)?\b.*\bdownload\b"
+_SPEED_PAT = r"(?P<val>\d+(?:\.\d+)?)\s*(?P<unit>KB/s|MB/s|GB/s|Kbit/s|Mbit/s|Gbit/s)"
 
-PAUSE_PATTERNS = [
-    re.compile(r"\b(paused|pause|pausing|suspend|suspended)\b", re.IGNORECASE),
-    re.compile(r"\bstop(ped|ping)?\b.*\bdownload\b", re.IGNORECASE),
-]
-RESUME_PATTERNS = [
-    re.compile(r"\b(resume|resuming|unpause|continuing)\b", re.IGNORECASE),
-    re.compile(r"\bstart(ed|ing)?\b.*\bdownload\b", re.IGNORECASE),
-    re.compile(r"\bdownloading\b", re.IGNORECASE),
-]
-
-SPEED_RE = re.compile(
-    r"(?P<val>\d+(?:\.\d+)?)\s*(?P<unit>KB/s|MB/s|GB/s|Kbit/s|Mbit/s|Gbit/s)",
+_STATUS_RE = re.compile(
+    rf"(?=.*?(?P<pause>{_PAUSE_PAT}))|(?=.*?(?P<resume>{_RESUME_PAT}))",
     re.IGNORECASE
 )
-
-def tail_lines(path: str, max_lines: int = 8000) -> List[str]:
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-        return lines[-max_lines:]
-    except Exception:
-        return []
-
-def infer_status_from_logs(content_log_path: str, appid: str) -> Optional[str]:
-    lines = tail_lines(content_log_path, max_lines=8000)
-    for line in reversed(lines):
-        m = APPID_RE.search(line)
-        if not m or m.group(1) != appid:
-            continue
-        if any(p.search(line) for p in PAUSE_PATTERNS):
-            return "PAUSED"
-        if any(r.search(line) for r in RESUME_PATTERNS):
-            return "DOWNLOADING"
-    return None
+SPEED_RE = re.compile(_SPEED_PAT, re.IGNORECASE)
+
+@functools.lru_cache(maxsize=8)
+def _appid_re(appid: str) -> "re.Pattern[str]":
+    return re.compile(rf"\bAppID\s*[:=]?\s*{re.escape(appid)}\b", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=8)
+def _log_line_re(appid: str) -> "re.Pattern[str]":
+    return re.compile(
+        rf"(?=.*?\bAppID\s*[:=]?\s*{re.escape(appid)}\b)"
+        rf"(?=(?:.*?(?P<pause>{_PAUSE_PAT})|.*?(?P<resume>{_RESUME_PAT}))?)"
+        rf"(?=(?:.*?{_SPEED_PAT})?)",
+        re.IGNORECASE
+    )
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+def _read_tail_bytes(f: BinaryIO, end: int, max_lines: int) -> Tuple[int, bytes]:
+    pos = end
+    chunks: List[bytes] = []
+    newlines = 0
+    while pos > 0 and newlines <= max_lines:
+        step = min(TAIL_BLOCK_SIZE, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        chunks.append(chunk)
+        newlines += chunk.count(b"\n")
+    chunks.reverse()
+    return pos, b"".join(chunks)
+
+class LogTail:
+    def __init__(self, path: str, max_lines: int = 8000) -> None:
+        self.path = path
+        self.lines: Deque[str] = deque(maxlen=max_lines)
+        self._pos = 0
+        self._ident: Optional[Tuple[int, int]] = None
+
+    def update(self) -> Deque[str]:
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                ident = (st.st_dev, st.st_ino)
+                reseed = ident != self._ident or st.st_size < self._pos
+                if reseed:
+                    start, data = _read_tail_bytes(f, st.st_size, self.lines.maxlen or 0)
+                else:
+                    start = self._pos
+                    f.seek(start)
+                    data = f.read(st.st_size - start)
+        except OSError:
+            self.lines.clear()
+            self._pos = 0
+            self._ident = None
+            return self.lines
+
+        cut = data.rfind(b"\n") + 1
+        lines = iter(data[:cut].decode("utf-8", errors="ignore").splitlines())
+        if reseed:
+            self.lines.clear()
+            self._ident = ident
+            if start > 0:
+                next(lines, None)
+        self._pos = start + cut
+        self.lines.extend(lines)
+        return self.lines
+
+_bps_mult: Dict[str, float] = {
+    "KB/s": 1024.0,
+    "MB/s": 1024.0**2,
+    "GB/s": 1024.0**3,
+    "Kbit/s": 1024.0 / 8,
+    "Mbit/s": 1024.0**2 / 8,
+    "Gbit/s": 1024.0**3 / 8,
+}
+_bps_mult.update({k.lower(): v for k, v in list(_bps_mult.items())})
+_BPS_MULT: Mapping[str, float] = MappingProxyType(_bps_mult)
 
 def speed_to_bps(val: float, unit: str) -> float:
-    u = unit.lower()
-    if u.endswith("bit/s"):
-        mult = {"kbit/s": 1024, "mbit/s": 1024**2, "gbit/s": 1024**3}[u]
-        return (val * mult) / 8.0
-    mult = {"kb/s": 1024, "mb/s": 1024**2, "gb/s": 1024**3}[u]
-    return val * mult
-
-def infer_speed_from_logs(content_log_path: str, appid: str) -> Optional[float]:
-    lines = tail_lines(content_log_path, max_lines=8000)
+    try:
+        return val * _BPS_MULT[unit]
+    except KeyError:
+        return val * _BPS_MULT[unit.lower()]
+
+def scan_log_tail(lines: Sequence[str], appid: str) -> Tuple[Optional[str], Optional[float]]:
+    status: Optional[str] = None
+    bps: Optional[float] = None
+    line_re = _log_line_re(appid)
+    appid_re = _appid_re(appid)
     for line in reversed(lines):
-        m_app = APPID_RE.search(line)
-        if not m_app or m_app.group(1) != appid:
+        if appid not in line:
             continue
-        m = SPEED_RE.search(line)
-        if not m:
+        if status is None and bps is None:
+            m = line_re.match(line)
+            if not m:
+                continue
+            if m.group("pause") is not None:
+                status = "PAUSED"
+            elif m.group("resume") is not None:
+                status = "DOWNLOADING"
+            if m.group("val") is not None:
+                bps = speed_to_bps(float(m.group("val")), m.group("unit"))
+        elif not appid_re.search(line):
             continue
-        try:
-            val = float(m.group("val"))
-            unit = m.group("unit")
-            return speed_to_bps(val, unit)
-        except Exception:
-            return None
-    return None
+        elif status is None:
+            m = _STATUS_RE.match(line)
+            if m:
+                status = "PAUSED" if m.lastgroup == "pause" else "DOWNLOADING"
+        else:
+            m = SPEED_RE.search(line)
+            if m:
+                bps = speed_to_bps(float(m.group("val")), m.group("unit"))
+        if status is not None and bps is not None:
+            break
+    return status, bps
+
+_SPEED_UNITS = (
+    (1, "{:.0f} B/s"),
+    (1024, "{:.1f} KB/s"),
+    (1024**2, "{:.2f} MB/s"),
+    (1024**3, "{:.2f} GB/s"),
+)
+
+_BYTE_UNITS = (
+    (1, "{:.0f} B"),
+    (1024, "{:.1f} KB"),
+    (1024**2, "{:.2f} MB"),
+    (1024**3, "{:.2f} GB"),
+    (1024**4, "{:.2f} TB"),
+)
+
+def _format_scaled(n: float, units: Tuple[Tuple[int, str], ...]) -> str:
+    idx = max(0, min(len(units) - 1, (int(n).bit_length() - 1) // 10))
+    div, fmt = units[idx]
+    return fmt.format(n / div)
 
 def format_speed(bps: float) -> str:
-    if bps < 1024:
-        return f"{bps:.0f} B/s"
-    kb = bps / 1024
-    if kb < 1024:
-        return f"{kb:.1f} KB/s"
-    mb = kb / 1024
-    if mb < 1024:
-        return f"{mb:.2f} MB/s"
-    gb = mb / 1024
-    return f"{gb:.2f} GB/s"
+    return _format_scaled(bps, _SPEED_UNITS)
 
 def format_bytes(n: int) -> str:
-    if n < 1024:
-        return f"{n} B"
-    kb = n / 1024
-    if kb < 1024:
-        return f"{kb:.1f} KB"
-    mb = kb / 1024
-    if mb < 1024:
-        return f"{mb:.2f} MB"
-    gb = mb / 1024
-    if gb < 1024:
-        return f"{gb:.2f} GB"
-    tb = gb / 1024
-    return f"{tb:.2f} TB"
+    return _format_scaled(n, _BYTE_UNITS)
 
 def format_progress(done: int, total: int) -> str:
     if total <= 0:
@@ -242,6 +447,7 @@ def main() -> None:
 
     libs = get_library_paths(steam_path)
     content_log = os.path.join(steam_path, "logs", "content_log.txt")
+    log_tail = LogTail(content_log)
 
     active = find_active_downloads(libs)
     if not active:
@@ -249,84 +455,105 @@ def main() -> None:
         return
 
     appid, lib = active[0]
-    name, bd, btd, sf, bs, bts, bc, sod = get_app_info(appid, lib)
+    name, bd, btd, sf = get_app_info(appid, lib)
     manifest_path = get_app_manifest_path(appid, lib)
 
-    net0 = psutil.net_io_counters()
-    t0 = time.time()
+    recv0 = psutil.net_io_counters().bytes_recv
+    t0 = time.monotonic()
 
     last_bd = bd
-    last_bs = bs
 
     no_download_progress_streak = 0
     no_net_streak = 0
 
-    for minute_idx in range(1, args.minutes + 1):
-        time.sleep(args.interval)
+    steamapps = os.path.join(steam_path, "steamapps")
+    log_dir = os.path.dirname(content_log)
+    watcher = ChangeWatcher([os.path.join(p, "steamapps") for p in libs] + [log_dir])
+    active_now = active
+    log_status: Optional[str] = None
+    bps_log: Optional[float] = None
+    log_appid: Optional[str] = None
 
-        active_now = find_active_downloads(libs)
-        if not active_now:
-            break
-
-        appid_now, lib_now = active_now[0]
-        if appid_now != appid or lib_now != lib:
-            appid, lib = appid_now, lib_now
-            name, bd, btd, sf, bs, bts, bc, sod = get_app_info(appid, lib)
-            manifest_path = get_app_manifest_path(appid, lib)
-            last_bd = bd
-            last_bs = bs
-            net0 = psutil.net_io_counters()
-            t0 = time.time()
-            no_download_progress_streak = 0
-            no_net_streak = 0
-            continue
-
-        name, bd, btd, sf, bs, bts, bc, sod = get_app_info(appid, lib)
-
-        bps_log = infer_speed_from_logs(content_log, appid) if os.path.isfile(content_log) else None
-
-        net1 = psutil.net_io_counters()
-        t1 = time.time()
-        dt_net = max(1e-6, t1 - t0)
-        recv_delta = max(0, net1.bytes_recv - net0.bytes_recv)
-        bps_fallback = recv_delta / dt_net
-
-        if recv_delta == 0:
-            no_net_streak += 1
-        else:
-            no_net_streak = 0
+    try:
+        for minute_idx in range(1, args.minutes + 1):
+            changed = watcher.wait(args.interval)
+
+            if steamapps in changed:
+                libs_now = get_library_paths(steam_path)
+                if libs_now != libs:
+                    libs = libs_now
+                    watcher.close()
+                    watcher = ChangeWatcher([os.path.join(p, "steamapps") for p in libs] + [log_dir])
+                    changed = watcher.wait(0)
+
+            if any(os.path.join(p, "steamapps") in changed for p in libs):
+                active_now = find_active_downloads(libs)
+            if not active_now:
+                break
 
-        if bps_log is not None:
-            bps = bps_log
-        else:
-            bps = bps_fallback
+            appid_now, lib_now = active_now[0]
+            if appid_now != appid or lib_now != lib:
+                appid, lib = appid_now, lib_now
+                name, bd, btd, sf = get_app_info(appid, lib)
+                manifest_path = get_app_manifest_path(appid, lib)
+                last_bd = bd
+                recv0 = psutil.net_io_counters().bytes_recv
+                t0 = time.monotonic()
+                no_download_progress_streak = 0
+                no_net_streak = 0
+                continue
+
+            if os.path.join(lib, "steamapps") in changed:
+                name, bd, btd, sf = get_app_info(appid, lib)
+
+            if log_dir in changed or log_appid != appid:
+                if _isfile(content_log):
+                    log_status, bps_log = scan_log_tail(log_tail.update(), appid)
+                else:
+                    log_status, bps_log = None, None
+                log_appid = appid
+
+            recv1 = psutil.net_io_counters().bytes_recv
+            t1 = time.monotonic()
+            dt_net = max(1e-6, t1 - t0)
+            recv_delta = max(0, recv1 - recv0)
+            bps_fallback = recv_delta / dt_net
+
+            if recv_delta == 0:
+                no_net_streak += 1
+            else:
+                no_net_streak = 0
 
-        log_status = infer_status_from_logs(content_log, appid) if os.path.isfile(content_log) else None
+            if bps_log is not None:
+                bps = bps_log
+            else:
+                bps = bps_fallback
 
-        if bd == last_bd:
-            no_download_progress_streak += 1
-        else:
-            no_download_progress_streak = 0
+            if bd == last_bd:
+                no_download_progress_streak += 1
+            else:
+                no_download_progress_streak = 0
 
-        if log_status == "PAUSED":
-            status = "ПАУЗА"
-        elif log_status == "DOWNLOADING":
-            status = "ЗАГРУЗКА"
-        else:
-            if no_net_streak >= 2 and no_download_progress_streak >= 2:
-                status = "ОЖИДАНИЕ/СТОП"
-            elif no_net_streak >= 2:
-                status = "ОЖИДАНИЕ/СТОП"
-            elif no_download_progress_streak >= 2:
+            if log_status == "PAUSED":
+                status = "ПАУЗА"
+            elif log_status == "DOWNLOADING":
                 status = "ЗАГРУЗКА"
             else:
-                status = "НЕИЗВЕСТНО"
+                if no_net_streak >= 2 and no_download_progress_streak >= 2:
+                    status = "ОЖИДАНИЕ/СТОП"
+                elif no_net_streak >= 2:
+                    status = "ОЖИДАНИЕ/СТОП"
+                elif no_download_progress_streak >= 2:
+                    status = "ЗАГРУЗКА"
+                else:
+                    status = "НЕИЗВЕСТНО"
 
-        print(f"[{minute_idx}/{args.minutes}] {name} | {format_speed(bps)} | {format_progress(bd, btd)} | {status}")
+            print(f"[{minute_idx}/{args.minutes}] {name} | {format_speed(bps)} | {format_progress(bd, btd)} | {status}")
 
-        last_bd = bd
-        last_bs = bs
-        net0, t0 = net1, t1
+            last_bd = bd
+            recv0, t0 = recv1, t1
+    finally:
+        watcher.close()
 
 if __name__ == "__main__":
     main()